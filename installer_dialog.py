@@ -3,13 +3,13 @@
 PyArchInit Installer - Dialog UI
 """
 
-from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtCore import Qt, QTimer
 from qgis.PyQt.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QRadioButton, QButtonGroup, QGroupBox, QTextEdit, QProgressBar,
     QFrame, QMessageBox
 )
-from qgis.PyQt.QtGui import QFont
+from qgis.PyQt.QtGui import QFont, QTextCursor
 
 # Qt5/Qt6 enum compatibility
 ALIGN_CENTER = getattr(Qt, 'AlignCenter', None) or Qt.AlignmentFlag.AlignCenter
@@ -17,11 +17,15 @@ FRAME_HLINE = getattr(QFrame, 'HLine', None) or QFrame.Shape.HLine
 FRAME_SUNKEN = getattr(QFrame, 'Sunken', None) or QFrame.Shadow.Sunken
 MSG_YES = getattr(QMessageBox, 'Yes', None) or QMessageBox.StandardButton.Yes
 MSG_NO = getattr(QMessageBox, 'No', None) or QMessageBox.StandardButton.No
+CURSOR_END = getattr(QTextCursor, 'End', None) or QTextCursor.MoveOperation.End
 
 
 class InstallerDialog(QDialog):
     """Dialog for PyArchInit Installer."""
 
+    # Minimum delay between two updates of the log view
+    LOG_FLUSH_INTERVAL_MS = 100
+
     def __init__(self, installer, parent=None):
         """Constructor.
 
@@ -30,8 +34,19 @@ class InstallerDialog(QDialog):
         """
         super().__init__(parent)
         self.installer = installer
+
+        # Log lines are buffered and written to the log view in batches
+        self._log_buf = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.LOG_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush_log)
+
         self.setup_ui()
 
+        # Stop background downloads once the dialog is closed
+        self.finished.connect(lambda result: self.installer.cancel_prefetch())
+
     def setup_ui(self):
         """Set up the dialog UI."""
         self.setWindowTitle("PyArchInit Installer")
@@ -199,12 +214,39 @@ class InstallerDialog(QDialog):
     def log_message(self, message):
         """Add a message to the log.
 
+        Messages are shown on the next flush of the log buffer, so bursts of
+        progress updates cost a single relayout of the log view.
+
         :param message: Message to add
         """
-        self.log_text.append(message)
-        # Scroll to bottom
-        scrollbar = self.log_text.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self._log_buf.append(message)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_log(self):
+        """Write the buffered log messages to the log view."""
+        self._flush_timer.stop()
+        if not self._log_buf:
+            return
+
+        self.log_text.append('\n'.join(self._log_buf))
+        self._log_buf.clear()
+        # Scroll to bottom without forcing a layout to query the scrollbar
+        cursor = self.log_text.textCursor()
+        cursor.movePosition(CURSOR_END)
+        self.log_text.setTextCursor(cursor)
+        self.log_text.ensureCursorVisible()
+
+    def set_controls_enabled(self, enabled):
+        """Enable or disable the controls while an installation is running.
+
+        :param enabled: Whether the user may start an installation
+        """
+        self.install_button.setEnabled(enabled)
+        self.master_radio.setEnabled(enabled)
+        self.dev_radio.setEnabled(enabled)
+        self.stratigraph_radio.setEnabled(enabled)
+        self.progress_bar.setVisible(not enabled)
 
     def on_install_clicked(self):
         """Handle install button click."""
@@ -215,9 +257,45 @@ class InstallerDialog(QDialog):
         else:
             branch = 'stratigraph'
 
-        # Confirm installation
+        # Disable UI while checking for updates
+        self.set_controls_enabled(False)
+
+        self._log_buf.clear()
+        self.log_text.clear()
+        self.log_message(f"Checking {branch} branch for updates...")
+
+        self.installer.check_up_to_date(
+            branch,
+            lambda up_to_date: self.on_update_checked(branch, up_to_date)
+        )
+
+    def on_update_checked(self, branch, up_to_date):
+        """Confirm and start the installation once the update check is done.
+
+        :param branch: Branch selected for installation
+        :param up_to_date: Whether the installed plugin already matches the branch
+        """
+        # The dialog was closed while the check was running
+        if not self.isVisible():
+            self.set_controls_enabled(True)
+            return
+
         existing = self.installer.get_existing_pyarchinit_info()
-        if existing['exists']:
+
+        # Confirm installation
+        reply = MSG_YES
+        if up_to_date:
+            reply = QMessageBox.question(
+                self,
+                'Already Up to Date',
+                f"PyArchInit is already up to date with the {branch} branch.\n\n"
+                f"Current version: {existing['version'] or 'Unknown'}\n"
+                f"Current folder: {existing['folder_name']}\n\n"
+                f"Reinstall anyway?",
+                MSG_YES | MSG_NO,
+                MSG_NO
+            )
+        elif existing['exists']:
             reply = QMessageBox.question(
                 self,
                 'Confirm Installation',
@@ -228,17 +306,13 @@ class InstallerDialog(QDialog):
                 MSG_YES | MSG_NO,
                 MSG_NO
             )
-            if reply != MSG_YES:
-                return
 
-        # Disable UI during installation
-        self.install_button.setEnabled(False)
-        self.master_radio.setEnabled(False)
-        self.dev_radio.setEnabled(False)
-        self.stratigraph_radio.setEnabled(False)
-        self.progress_bar.setVisible(True)
+        if reply != MSG_YES:
+            if up_to_date:
+                self.log_message("Already up to date, nothing was installed.")
+            self.set_controls_enabled(True)
+            return
 
-        self.log_text.clear()
         self.log_message(f"Starting installation of {branch} branch...")
 
         # Start installation
@@ -248,33 +322,45 @@ class InstallerDialog(QDialog):
             finished_callback=self.on_finished
         )
 
-    def on_progress(self, message):
+    def on_progress(self, message, total=None):
         """Handle progress updates.
 
-        :param message: Progress message
+        Called either with a message, or with byte counts while the archive
+        is downloading.
+
+        :param message: Progress message, or bytes received so far
+        :param total: Total bytes expected, -1 when unknown
         """
+        if total is not None:
+            # Byte counts: show a determinate bar once the size is known
+            if total > 0:
+                self.progress_bar.setRange(0, int(total))
+                self.progress_bar.setValue(int(message))
+            return
+
+        # Back to indeterminate for the extraction phase
+        if self.progress_bar.maximum() != 0:
+            self.progress_bar.setRange(0, 0)
         self.log_message(message)
 
-    def on_finished(self, success, message):
+    def on_finished(self, success, message, info=None):
         """Handle installation completion.
 
         :param success: Whether installation succeeded
         :param message: Result message
+        :param info: Dict with exists, path, version, folder_name of the
+            installed plugin, if known
         """
-        self.progress_bar.setVisible(False)
-        self.install_button.setEnabled(True)
-        self.master_radio.setEnabled(True)
-        self.dev_radio.setEnabled(True)
-
-        self.stratigraph_radio.setEnabled(True)
+        self.set_controls_enabled(True)
 
         if success:
             self.log_message("Installation completed successfully!")
+            self._flush_log()
             QMessageBox.information(self, "Installation Complete", message)
 
             # Update status display
-            existing = self.installer.get_existing_pyarchinit_info()
-            self.update_current_status(existing)
+            self.update_current_status(info or self.installer.get_existing_pyarchinit_info())
         else:
             self.log_message(f"Installation failed: {message}")
+            self._flush_log()
             QMessageBox.critical(self, "Installation Failed", message)
@@ -3,23 +3,415 @@
 PyArchInit Installer - Main Plugin Class
 """
 
+# hashlib, shutil, tempfile and zipfile are only needed while installing and
+# are imported where used, keeping them out of QGIS startup
 import os
-import shutil
-import tempfile
-import zipfile
-import configparser
-from pathlib import Path
-
-from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication, Qt, QUrl
+import json
+import time
+import threading
+
+from qgis.PyQt.QtCore import (
+    QSettings, QTranslator, QCoreApplication, Qt, QUrl,
+    QObject, QThread, pyqtSignal, pyqtSlot
+)
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction, QMessageBox
-from qgis.PyQt.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from qgis.PyQt.QtNetwork import (
+    QNetworkAccessManager, QNetworkDiskCache, QNetworkRequest, QNetworkReply
+)
 from qgis.core import QgsApplication
 
 from .installer_dialog import InstallerDialog
 
 # Qt5/Qt6 enum compatibility
 NETWORK_NO_ERROR = getattr(QNetworkReply, 'NoError', None) or QNetworkReply.NetworkError.NoError
+CACHE_LOAD_CONTROL_ATTRIBUTE = (getattr(QNetworkRequest, 'CacheLoadControlAttribute', None)
+                                or QNetworkRequest.Attribute.CacheLoadControlAttribute)
+CACHE_SAVE_CONTROL_ATTRIBUTE = (getattr(QNetworkRequest, 'CacheSaveControlAttribute', None)
+                                or QNetworkRequest.Attribute.CacheSaveControlAttribute)
+CACHE_PREFER_NETWORK = (getattr(QNetworkRequest, 'PreferNetwork', None)
+                        or QNetworkRequest.CacheLoadControl.PreferNetwork)
+CONTENT_LENGTH_HEADER = (getattr(QNetworkRequest, 'ContentLengthHeader', None)
+                         or QNetworkRequest.KnownHeaders.ContentLengthHeader)
+
+# Folders of this installer plugin, never treated as a pyarchinit install
+EXCLUDE_FOLDERS = frozenset(x.lower() for x in (
+    'pyarchinit_installer',
+    'pyarchinit-installer'
+))
+
+# Folder names pyarchinit is usually found under, in order of preference
+PREFERRED_FOLDERS = (
+    'pyarchinit',
+    'pyarchinit-master',
+    'pyarchinit-main',
+    'pyarchinit-feature-qt6-migration',
+    'pyarchinit-dev'
+)
+_FOLDER_RANK = {name.lower(): rank for rank, name in enumerate(PREFERRED_FOLDERS)}
+
+# File inside the installed plugin recording the commit it was built from
+INSTALLED_SHA_FILE = '.installer_sha'
+
+# Prefix of folders holding replaced installations until they are deleted
+TRASH_PREFIX = '.pyarchinit.old.'
+
+# Marks a trash folder whose installation could not be put back
+KEEP_MARKER = 'KEEP_NOT_RESTORED.txt'
+
+# Prefix of folders a new archive is extracted into before moving in place
+STAGING_PREFIX = '.pyarchinit.incoming.'
+
+# Suffix of the file next to a cached archive storing its digest
+DIGEST_SUFFIX = '.blake2b'
+
+# Archive members QGIS never loads, relative to the branch folder
+_SKIP_PREFIXES = ('tests/', 'test/', '.github/', 'docs/', '.git')
+_SKIP_SUFFIXES = ('.pyc', '.po', '.ts')
+
+
+def _should_skip(name):
+    """Check whether an archive member can be left out of the install.
+
+    :param name: Member path relative to the branch folder
+    """
+    return name.startswith(_SKIP_PREFIXES) or name.endswith(_SKIP_SUFFIXES)
+
+
+def _new_digest():
+    """Create the hash object used to checksum downloaded archives."""
+    import hashlib
+
+    return hashlib.blake2b(digest_size=16)
+
+
+def _file_digest(path):
+    """Compute the archive checksum of a file.
+
+    :param path: Path to the file
+    :returns: Hex digest of the file contents
+    """
+    digest = _new_digest()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst, copying it when linking is not possible.
+
+    :param src: Source file path
+    :param dst: Destination file path
+    """
+    import shutil
+
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _read_metadata_fast(path):
+    """Read the plugin name and version from a metadata.txt file.
+
+    Only the ``[general]`` section is looked at and reading stops as soon as
+    both keys were found.
+
+    :param path: Path to metadata.txt
+    :returns: Tuple (name, version), with None for missing keys
+    """
+    name = None
+    version = None
+    in_general = False
+
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        for raw_line in f:
+            # Indented lines continue a multi-line value
+            if raw_line[:1] in (' ', '\t'):
+                continue
+            line = raw_line.strip()
+            if not line or line[0] in ';#':
+                continue
+            if line.startswith('['):
+                in_general = line.lower() == '[general]'
+                continue
+            if not in_general:
+                continue
+
+            # Like configparser, accept whichever of '=' and ':' comes first
+            eq = line.find('=')
+            colon = line.find(':')
+            if eq < 0 and colon < 0:
+                continue
+            if eq < 0 or 0 <= colon < eq:
+                eq = colon
+            key, value = line[:eq], line[eq + 1:]
+            key = key.strip().lower()
+            if key == 'name' and name is None:
+                name = value.strip()
+            elif key == 'version' and version is None:
+                version = value.strip()
+
+            if name is not None and version is not None:
+                break
+
+    return name, version
+
+
+class InstallWorker(QObject):
+    """Install a downloaded pyarchinit archive into the plugins directory.
+
+    Meant to be moved to a QThread: ``run`` extracts the archive, moves the
+    existing installation aside and moves the new plugin in place. The old
+    files are deleted in the background afterwards.
+    """
+
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(bool, str)
+
+    # Upper bound of the threads decompressing archive members
+    EXTRACT_MAX_WORKERS = 8
+
+    def __init__(self, zip_path, plugins_path, existing, sha=None, digest=None, cached=False):
+        """Constructor.
+
+        :param zip_path: Path to the downloaded branch archive
+        :param plugins_path: QGIS plugins directory
+        :param existing: Info dict of the installation to replace
+        :param sha: Commit SHA of the archive, recorded in the installed plugin
+        :param digest: Expected checksum of the archive, verified before
+            anything is extracted
+        :param cached: Whether the archive lives in the archive cache, it is
+            then evicted when it cannot be extracted
+        """
+        super().__init__()
+        self.zip_path = zip_path
+        self.plugins_path = plugins_path
+        self.existing = existing
+        self.sha = sha
+        self.digest = digest
+        self.cached = cached
+
+    @pyqtSlot()
+    def run(self):
+        """Perform the installation, emitting finished once cleanup is done."""
+        import shutil
+        import tempfile
+
+        staging_dir = None
+        # (original path, renamed path) of previous installations
+        moved_aside = []
+        try:
+            # Extracting next to the target keeps the final move a rename on
+            # the same filesystem instead of a second copy of every file
+            staging_dir = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=self.plugins_path)
+            success, message = self._install(staging_dir, moved_aside)
+        except Exception as e:
+            success, message = False, f"Installation error: {str(e)}"
+
+        not_restored = []
+        if not success:
+            # Put the previous installation back where it was
+            for old_path, aside_path in reversed(moved_aside):
+                try:
+                    os.rename(aside_path, old_path)
+                except OSError:
+                    not_restored.append(aside_path)
+
+        if not_restored:
+            # The trash folder now holds the only copy of the previous
+            # installation, keep it out of every later trash sweep
+            trash_dir = os.path.dirname(not_restored[0])
+            try:
+                with open(os.path.join(trash_dir, KEEP_MARKER), 'w') as f:
+                    f.write("Previous pyarchinit installation that could not be restored.\n")
+            except OSError:
+                pass
+            message += ("\n\nThe previous installation could not be put back and was kept in:\n"
+                        + "\n".join(not_restored))
+
+        if staging_dir:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        try:
+            self._delete_trash()
+        except OSError:
+            pass
+
+        # Only report once everything is cleaned up, the GUI allows a new
+        # install as soon as this arrives
+        self.finished.emit(success, message)
+
+    def _install(self, staging_dir, moved_aside):
+        """Extract the archive and move the new plugin in place.
+
+        :param staging_dir: Directory to extract the archive into
+        :param moved_aside: List collecting (original path, renamed path) of
+            the previous installations moved out of the way
+        :returns: Tuple (success, message)
+        """
+        import shutil
+        import tempfile
+        import zipfile
+
+        if self.digest:
+            self.progress.emit("Verifying archive...")
+            if _file_digest(self.zip_path) != self.digest:
+                self._evict_archive()
+                return False, "Archive checksum mismatch, the cached archive was removed. Please try again."
+
+        self.progress.emit("Extracting files...")
+
+        # Extract zip. An archive that was cached broken matches its own
+        # digest, so any extraction failure evicts it as well.
+        try:
+            with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
+                self._extract(zip_ref, staging_dir)
+        except Exception as e:
+            if not self.cached:
+                raise
+            self._evict_archive()
+            return False, f"Installation error: {str(e)}\n\nThe cached archive was removed. Please try again."
+
+        # Find the extracted folder (it will have a branch-specific name)
+        extracted_folders = os.listdir(staging_dir) if os.path.isdir(staging_dir) else []
+        if not extracted_folders:
+            if self.cached:
+                self._evict_archive()
+            return False, "No files found in downloaded archive"
+
+        source_folder = os.path.join(staging_dir, extracted_folders[0])
+        target_path = os.path.join(self.plugins_path, 'pyarchinit')
+
+        # Move any existing pyarchinit installations out of the way. A
+        # rename is instant, the slow delete runs once the new plugin is
+        # in place. The target is checked too, in case the folder name
+        # of the existing installation was different.
+        trash_dir = tempfile.mkdtemp(prefix=TRASH_PREFIX, dir=self.plugins_path)
+        old_paths = [self.existing['path']] if self.existing['exists'] else []
+        old_paths.append(target_path)
+        for old_path in old_paths:
+            if not os.path.exists(old_path):
+                continue
+            self.progress.emit(f"Removing existing installation: {os.path.basename(old_path)}...")
+            aside_path = os.path.join(trash_dir, str(len(moved_aside)))
+            try:
+                os.rename(old_path, aside_path)
+            except OSError as e:
+                return False, f"Failed to remove existing installation: {str(e)}"
+            moved_aside.append((old_path, aside_path))
+
+        self.progress.emit("Moving new plugin files into place...")
+
+        try:
+            os.replace(source_folder, target_path)
+        except OSError:
+            # Renaming can fail on Windows when files are held open,
+            # fall back to copying the tree; staging lives inside the
+            # plugins directory, so files are hard-linked where possible
+            try:
+                shutil.copytree(source_folder, target_path, copy_function=_link_or_copy)
+            except Exception:
+                shutil.rmtree(target_path, ignore_errors=True)
+                raise
+
+        if self.sha:
+            try:
+                with open(os.path.join(target_path, INSTALLED_SHA_FILE), 'w') as f:
+                    f.write(self.sha)
+            except OSError:
+                # Only costs a re-download on the next update check
+                pass
+
+        self.progress.emit("Cleaning up...")
+        return True, ""
+
+    def _evict_archive(self):
+        """Remove the archive and its digest from the archive cache."""
+        for path in (self.zip_path, self.zip_path + DIGEST_SUFFIX):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _delete_trash(self):
+        """Delete renamed previous installations in a background thread.
+
+        Leftovers of earlier runs that were interrupted are removed too,
+        including their staging folders. Trash folders marked with
+        KEEP_MARKER hold an installation that could not be restored and are
+        left alone.
+        """
+        import shutil
+
+        doomed = [
+            entry.path for entry in os.scandir(self.plugins_path)
+            if entry.name.startswith((TRASH_PREFIX, STAGING_PREFIX))
+            and not os.path.exists(os.path.join(entry.path, KEEP_MARKER))
+        ]
+        if not doomed:
+            return
+
+        def delete_all():
+            for path in doomed:
+                shutil.rmtree(path, ignore_errors=True)
+
+        threading.Thread(target=delete_all, daemon=True).start()
+
+    def _extract(self, zip_ref, extract_dir):
+        """Extract the archive members needed at runtime.
+
+        Members whose path escapes ``extract_dir`` make the whole archive
+        rejected. Files are decompressed by a thread pool, zlib releases the
+        GIL so this scales with the number of cores.
+
+        :param zip_ref: Open ZipFile of the branch archive
+        :param extract_dir: Directory to extract into
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        import zipfile
+
+        extract_root = os.path.realpath(extract_dir)
+
+        files = []
+        for info in zip_ref.infolist():
+            target = os.path.normpath(os.path.join(extract_root, info.filename))
+            if os.path.commonpath([extract_root, target]) != extract_root:
+                raise ValueError(f"Unsafe path in archive: {info.filename}")
+
+            # Member names start with the branch-specific top-level folder
+            name = info.filename.split('/', 1)[1] if '/' in info.filename else ''
+            if _should_skip(name):
+                continue
+
+            # Directories are created up front so the workers never race
+            # on creating the same parent
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                files.append(info)
+
+        # A ZipFile handle must not be shared between threads, each worker
+        # opens its own
+        local = threading.local()
+        handles = []
+
+        def extract_member(info):
+            handle = getattr(local, 'zip_ref', None)
+            if handle is None:
+                handle = local.zip_ref = zipfile.ZipFile(zip_ref.filename, 'r')
+                handles.append(handle)
+            handle.extract(info, extract_dir)
+
+        max_workers = min(self.EXTRACT_MAX_WORKERS, os.cpu_count() or 4)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(extract_member, files))
+        finally:
+            for handle in handles:
+                handle.close()
 
 
 class PyArchInitInstaller:
@@ -33,6 +425,24 @@ class PyArchInitInstaller:
     STRATIGRAPH_BRANCH = "Stratigraph_00001"
 
     GITHUB_ZIP_URL = "https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.zip"
+    GITHUB_BRANCH_API_URL = "https://api.github.com/repos/{owner}/{repo}/branches/{branch}"
+
+    # Branch keys used by the dialog
+    BRANCHES = {
+        'master': MASTER_BRANCH,
+        'dev': DEV_BRANCH,
+        'stratigraph': STRATIGRAPH_BRANCH,
+    }
+
+    # Downloaded archives are kept this long before being evicted
+    CACHE_MAX_AGE_DAYS = 7
+
+    # Size limit of the HTTP cache used for GitHub API responses
+    HTTP_CACHE_MAX_SIZE = 100 * 1024 * 1024
+
+    # Branches downloaded into the cache while the dialog is open
+    PREFETCH_BRANCHES = ('master', 'dev')
+    PREFETCH_MAX_CONCURRENT = 2
 
     def __init__(self, iface):
         """Constructor.
@@ -44,6 +454,13 @@ class PyArchInitInstaller:
         """
         self.iface = iface
         self.plugin_dir = os.path.dirname(__file__)
+        self.cache_dir = os.path.join(self.plugin_dir, '.cache')
+
+        # The settings directory does not change during a QGIS session
+        self._plugins_path = os.path.join(
+            QgsApplication.qgisSettingsDirPath(),
+            'python', 'plugins'
+        )
 
         # Initialize locale
         locale = QSettings().value('locale/userLocale')[0:2]
@@ -60,11 +477,31 @@ class PyArchInitInstaller:
         self.actions = []
         self.menu = self.tr('&PyArchInit Installer')
 
-        # Network manager for downloads
+        # Network manager for downloads, with an HTTP cache so unchanged
+        # API responses are revalidated instead of downloaded again
         self.network_manager = QNetworkAccessManager()
+        http_cache = QNetworkDiskCache(self.network_manager)
+        http_cache.setCacheDirectory(os.path.join(self.plugin_dir, '.httpcache'))
+        http_cache.setMaximumCacheSize(self.HTTP_CACHE_MAX_SIZE)
+        self.network_manager.setCache(http_cache)
         self.current_reply = None
         self.dialog = None
 
+        # (plugins dir mtime_ns, info) from the last installation scan
+        self._info_cache = None
+
+        # Background installation thread and its worker; an install counts
+        # as running from install_plugin until its finished_callback
+        self._install_thread = None
+        self._install_worker = None
+        self._install_running = False
+
+        # Branches waiting to be prefetched and the state of those in
+        # flight; bumping the generation stops the queue
+        self._prefetch_queue = []
+        self._prefetches = {}
+        self._prefetch_generation = 0
+
     def tr(self, message):
         """Get the translation for a string using Qt translation API."""
         return QCoreApplication.translate('PyArchInitInstaller', message)
@@ -119,12 +556,15 @@ class PyArchInitInstaller:
             self.iface.removePluginMenu(self.tr('&PyArchInit Installer'), action)
             self.iface.removeToolBarIcon(action)
 
+        self.cancel_prefetch()
+
+        if self._install_thread is not None and self._install_thread.isRunning():
+            self._install_thread.quit()
+            self._install_thread.wait()
+
     def get_plugins_path(self):
         """Get the QGIS plugins directory path."""
-        return os.path.join(
-            QgsApplication.qgisSettingsDirPath(),
-            'python', 'plugins'
-        )
+        return self._plugins_path
 
     def get_existing_pyarchinit_info(self):
         """Check for existing pyarchinit installation and get its info.
@@ -134,8 +574,30 @@ class PyArchInitInstaller:
         - path: str (path to the plugin folder)
         - version: str (version from metadata.txt if available)
         - folder_name: str (actual folder name)
+
+        The result is cached until the plugins directory is modified.
         """
         plugins_path = self.get_plugins_path()
+
+        try:
+            mtime_ns = os.stat(plugins_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if (mtime_ns is not None and self._info_cache is not None
+                and self._info_cache[0] == mtime_ns):
+            return dict(self._info_cache[1])
+
+        result = self._scan_pyarchinit_info(plugins_path)
+        if mtime_ns is not None:
+            self._info_cache = (mtime_ns, dict(result))
+        return result
+
+    def _scan_pyarchinit_info(self, plugins_path):
+        """Scan the plugins directory for an existing pyarchinit installation.
+
+        :param plugins_path: QGIS plugins directory
+        """
         result = {
             'exists': False,
             'path': None,
@@ -143,83 +605,69 @@ class PyArchInitInstaller:
             'folder_name': None
         }
 
-        # Folders to exclude (this installer plugin)
-        exclude_folders = [
-            'pyarchinit_installer',
-            'pyarchinit-installer'
-        ]
-
-        # Check for various possible folder names
-        possible_names = [
-            'pyarchinit',
-            'pyarchinit-master',
-            'pyarchinit-main',
-            'pyarchinit-feature-qt6-migration',
-            'pyarchinit-dev'
-        ]
+        if not os.path.isdir(plugins_path):
+            return result
 
-        # Also check for any folder starting with 'pyarchinit' but exclude installer
-        if os.path.exists(plugins_path):
-            for item in os.listdir(plugins_path):
-                item_path = os.path.join(plugins_path, item)
-                # Skip if it's the installer plugin
-                if item.lower() in [x.lower() for x in exclude_folders]:
+        # Single pass over the plugins directory: DirEntry carries the file
+        # type, so no extra exists/isdir calls are needed per candidate
+        candidates = []
+        with os.scandir(plugins_path) as entries:
+            for entry in entries:
+                lower_name = entry.name.lower()
+                if not lower_name.startswith('pyarchinit') or lower_name in EXCLUDE_FOLDERS:
                     continue
-                if os.path.isdir(item_path) and item.lower().startswith('pyarchinit'):
-                    if item not in possible_names:
-                        possible_names.append(item)
+                if not entry.is_dir():
+                    continue
+                if _FOLDER_RANK.get(lower_name) == 0:
+                    # The canonical folder name wins over anything else,
+                    # no need to look at the remaining entries
+                    info = self._read_plugin_info(entry.path, entry.name)
+                    if info:
+                        return info
+                    continue
+                candidates.append(entry.name)
 
-        for name in possible_names:
-            # Skip installer folders
-            if name.lower() in [x.lower() for x in exclude_folders]:
-                continue
+        # Well-known folder names take precedence over other matches
+        unranked = len(PREFERRED_FOLDERS)
+        candidates.sort(key=lambda name: _FOLDER_RANK.get(name.lower(), unranked))
 
-            plugin_path = os.path.join(plugins_path, name)
-            if os.path.exists(plugin_path) and os.path.isdir(plugin_path):
-                # Verify it's actually pyarchinit by checking metadata.txt name
-                metadata_path = os.path.join(plugin_path, 'metadata.txt')
-                if os.path.exists(metadata_path):
-                    try:
-                        config = configparser.ConfigParser()
-                        config.read(metadata_path)
-                        plugin_name = config.get('general', 'name', fallback='').lower()
-                        # Skip if this is the installer
-                        if 'installer' in plugin_name:
-                            continue
-                        result['exists'] = True
-                        result['path'] = plugin_path
-                        result['folder_name'] = name
-                        result['version'] = config.get('general', 'version', fallback='Unknown')
-                    except Exception:
-                        # If we can't read metadata, assume it's pyarchinit
-                        result['exists'] = True
-                        result['path'] = plugin_path
-                        result['folder_name'] = name
-                        result['version'] = 'Unknown'
-                else:
-                    # No metadata.txt, might be pyarchinit without metadata
-                    result['exists'] = True
-                    result['path'] = plugin_path
-                    result['folder_name'] = name
-                    result['version'] = 'Unknown'
-
-                if result['exists']:
-                    break  # Found one, stop searching
+        for name in candidates:
+            info = self._read_plugin_info(os.path.join(plugins_path, name), name)
+            if info:
+                return info  # Found one, stop searching
 
         return result
 
-    def download_branch(self, branch, callback):
-        """Download a branch from GitHub as a zip file.
+    def _read_plugin_info(self, plugin_path, folder_name):
+        """Describe a candidate pyarchinit folder.
 
-        :param branch: Branch name to download
-        :param callback: Function to call when download completes
+        :param plugin_path: Path to the candidate folder
+        :param folder_name: Name of the candidate folder
+        :returns: Info dict, or None if the folder holds the installer
         """
-        url = self.GITHUB_ZIP_URL.format(
-            owner=self.REPO_OWNER,
-            repo=self.REPO_NAME,
-            branch=branch
-        )
+        # Verify it's actually pyarchinit by checking metadata.txt name
+        try:
+            plugin_name, version = _read_metadata_fast(os.path.join(plugin_path, 'metadata.txt'))
+        except Exception:
+            # No readable metadata.txt, assume it's pyarchinit
+            plugin_name, version = None, None
+
+        # Skip if this is the installer
+        if 'installer' in (plugin_name or '').lower():
+            return None
+
+        return {
+            'exists': True,
+            'path': plugin_path,
+            'version': version or 'Unknown',
+            'folder_name': folder_name
+        }
+
+    def _build_request(self, url):
+        """Create a network request that follows GitHub redirects.
 
+        :param url: URL to request
+        """
         request = QNetworkRequest(QUrl(url))
         # Qt5: use FollowRedirectsAttribute; Qt6: redirects are followed by default
         if hasattr(QNetworkRequest, 'FollowRedirectsAttribute'):
@@ -229,111 +677,492 @@ class PyArchInitInstaller:
                 QNetworkRequest.RedirectPolicyAttribute,
                 QNetworkRequest.NoLessSafeRedirectPolicy
             )
+        return request
 
-        self.current_reply = self.network_manager.get(request)
-        self.current_reply.finished.connect(lambda: callback(self.current_reply))
+    def fetch_branch_sha(self, branch, callback):
+        """Look up the commit SHA the branch currently points to.
 
-        return self.current_reply
+        :param branch: Branch name to look up
+        :param callback: Function called with the SHA, or None if unavailable
+        """
+        url = self.GITHUB_BRANCH_API_URL.format(
+            owner=self.REPO_OWNER,
+            repo=self.REPO_NAME,
+            branch=branch
+        )
 
-    def install_plugin(self, branch, progress_callback=None, finished_callback=None):
-        """Download and install the plugin from the specified branch.
+        request = self._build_request(url)
+        request.setRawHeader(b'Accept', b'application/vnd.github+json')
+        # Reuse fresh cached responses and revalidate stale ones with their
+        # ETag; a 304 does not count against the GitHub API rate limit
+        request.setAttribute(CACHE_LOAD_CONTROL_ATTRIBUTE, CACHE_PREFER_NETWORK)
+        reply = self.network_manager.get(request)
+
+        def on_finished():
+            sha = None
+            if reply.error() == NETWORK_NO_ERROR:
+                try:
+                    data = json.loads(bytes(reply.readAll()).decode('utf-8'))
+                    sha = data['commit']['sha']
+                except Exception:
+                    sha = None
+            reply.deleteLater()
+            callback(sha)
+
+        reply.finished.connect(on_finished)
+        return reply
+
+    def get_installed_sha(self, plugin_path):
+        """Get the commit SHA an installed plugin was built from.
+
+        :param plugin_path: Path to the installed plugin folder
+        :returns: The SHA, or None if it was not recorded
+        """
+        try:
+            with open(os.path.join(plugin_path, INSTALLED_SHA_FILE), 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
 
-        :param branch: Branch to install ('master' or 'dev')
-        :param progress_callback: Function to call with progress updates
-        :param finished_callback: Function to call when finished (success, message)
+    def get_cache_path(self, branch, sha):
+        """Get the cache file path for a branch archive at a given commit.
+
+        :param branch: Branch name
+        :param sha: Commit SHA of the branch head
         """
-        branch_map = {
-            'master': self.MASTER_BRANCH,
-            'dev': self.DEV_BRANCH,
-            'stratigraph': self.STRATIGRAPH_BRANCH,
-        }
-        actual_branch = branch_map.get(branch, self.MASTER_BRANCH)
+        safe_branch = branch.replace('/', '-')
+        return os.path.join(self.cache_dir, f"{safe_branch}-{sha}.zip")
+
+    def get_cached_zip(self, branch, sha):
+        """Get the cached archive of a branch at a given commit.
 
+        :param branch: Branch name
+        :param sha: Commit SHA of the branch head, or None if unknown
+        :returns: Path to the archive, or None on a cache miss
+        """
+        if not sha:
+            return None
+        cache_path = self.get_cache_path(branch, sha)
+        if os.path.isfile(cache_path) and os.path.getsize(cache_path) > 0:
+            return cache_path
+        return None
+
+    def get_cached_digest(self, cache_path):
+        """Get the checksum recorded for a cached archive.
+
+        :param cache_path: Path to the cached archive
+        :returns: Hex digest, or None if it was not recorded
+        """
+        try:
+            with open(cache_path + DIGEST_SUFFIX, 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def prune_cache(self):
+        """Remove cached archives older than CACHE_MAX_AGE_DAYS."""
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        cutoff = time.time() - self.CACHE_MAX_AGE_DAYS * 86400
+        for item in os.listdir(self.cache_dir):
+            item_path = os.path.join(self.cache_dir, item)
+            try:
+                if os.stat(item_path).st_mtime < cutoff:
+                    os.remove(item_path)
+            except OSError:
+                pass
+
+    def download_branch(self, branch, zip_path, callback, progress_callback=None):
+        """Download a branch from GitHub as a zip file.
+
+        The response body is streamed to ``zip_path`` as it arrives, so the
+        archive is never held in memory as a whole, and checksummed on the
+        way.
+
+        :param branch: Branch name to download
+        :param zip_path: Path of the file the archive is written to
+        :param callback: Function to call with (reply, digest, error) when the
+            download completes; error is set when the file could not be written
+        :param progress_callback: Function called with (bytes received, bytes total)
+        """
+        url = self.GITHUB_ZIP_URL.format(
+            owner=self.REPO_OWNER,
+            repo=self.REPO_NAME,
+            branch=branch
+        )
+
+        request = self._build_request(url)
+        # Archives are kept in the SHA-keyed cache, don't store them twice
+        request.setAttribute(CACHE_SAVE_CONTROL_ATTRIBUTE, False)
+
+        zip_file = open(zip_path, 'wb')
+        digest = _new_digest()
+        write_errors = []
+        reply = self.network_manager.get(request)
+
+        def on_ready_read():
+            chunk = bytes(reply.readAll())
+            if write_errors:
+                return
+            try:
+                zip_file.write(chunk)
+            except OSError as e:
+                # e.g. disk full: stop the download, the error is reported
+                # once the reply finished
+                write_errors.append(f"Cannot write downloaded archive: {str(e)}")
+                reply.abort()
+                return
+            digest.update(chunk)
+
+        def on_finished():
+            # Drain anything still buffered before closing the file
+            on_ready_read()
+            try:
+                zip_file.close()
+            except OSError as e:
+                if not write_errors:
+                    write_errors.append(f"Cannot write downloaded archive: {str(e)}")
+            callback(reply, digest.hexdigest(), write_errors[0] if write_errors else None)
+
+        reply.readyRead.connect(on_ready_read)
+        reply.finished.connect(on_finished)
         if progress_callback:
-            progress_callback(f"Downloading {branch} branch...")
+            reply.downloadProgress.connect(
+                lambda received, total: progress_callback(received, total))
+
+        self.current_reply = reply
+        return self.current_reply
+
+    def download_to_cache(self, branch, sha, callback, progress_callback=None):
+        """Download a branch archive into the cache directory.
+
+        The archive is streamed into a unique .part file and only moved to
+        its cache name once the download completed.
+
+        :param branch: Branch name to download
+        :param sha: Commit SHA of the branch head, or None if unknown
+        :param callback: Function called with (zip_path, error). zip_path is
+            None on failure, and a temporary file to discard when sha is None
+        :param progress_callback: Function called with (bytes received, bytes total)
+        """
+        import tempfile
+
+        cache_path = self.get_cache_path(branch, sha) if sha else None
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, part_path = tempfile.mkstemp(
+                prefix=branch.replace('/', '-') + '-', suffix='.part', dir=self.cache_dir)
+            os.close(fd)
+        except OSError as e:
+            callback(None, f"Cannot create cache directory: {str(e)}")
+            return None
+
+        def discard_part():
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+
+        def on_download_complete(reply, digest, error):
+            reply.deleteLater()
+            if error:
+                discard_part()
+                callback(None, error)
+                return
 
-        def on_download_complete(reply):
             if reply.error() != NETWORK_NO_ERROR:
-                if finished_callback:
-                    finished_callback(False, f"Download error: {reply.errorString()}")
+                discard_part()
+                callback(None, f"Download error: {reply.errorString()}")
                 return
 
             try:
-                if progress_callback:
-                    progress_callback("Download complete. Installing...")
+                # A dropped connection can end the reply without an error, catch
+                # truncated archives before they reach the cache or the install
+                expected_size = reply.header(CONTENT_LENGTH_HEADER)
+                if (expected_size is not None and not reply.hasRawHeader(b'Content-Encoding')
+                        and os.path.getsize(part_path) != int(expected_size)):
+                    discard_part()
+                    callback(None, "Download incomplete, please try again")
+                    return
 
-                # Save to temp file
-                temp_dir = tempfile.mkdtemp()
-                zip_path = os.path.join(temp_dir, 'pyarchinit.zip')
+                if cache_path:
+                    os.replace(part_path, cache_path)
+            except OSError as e:
+                discard_part()
+                callback(None, f"Cannot store downloaded archive: {str(e)}")
+                return
 
-                with open(zip_path, 'wb') as f:
-                    f.write(reply.readAll().data())
+            if cache_path:
+                try:
+                    with open(cache_path + DIGEST_SUFFIX, 'w') as f:
+                        f.write(digest)
+                except OSError:
+                    # The archive is then used without verification
+                    pass
+                callback(cache_path, None)
+            else:
+                callback(part_path, None)
+
+        try:
+            return self.download_branch(branch, part_path, on_download_complete, progress_callback)
+        except OSError as e:
+            discard_part()
+            callback(None, f"Cannot write downloaded archive: {str(e)}")
+            return None
+
+    def prefetch_branches(self):
+        """Download the PREFETCH_BRANCHES archives into the cache.
+
+        Runs in the background while the dialog is open so that installing
+        one of them is served from the cache. At most
+        PREFETCH_MAX_CONCURRENT downloads run at the same time.
+        """
+        self.cancel_prefetch()
+        self.prune_cache()
+        self._prefetch_queue = [self.BRANCHES[b] for b in self.PREFETCH_BRANCHES]
+        for _ in range(self.PREFETCH_MAX_CONCURRENT):
+            self._start_next_prefetch()
 
-                if progress_callback:
-                    progress_callback("Extracting files...")
-
-                # Extract zip
-                extract_dir = os.path.join(temp_dir, 'extracted')
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_dir)
-
-                # Find the extracted folder (it will have a branch-specific name)
-                extracted_folders = os.listdir(extract_dir)
-                if not extracted_folders:
-                    if finished_callback:
-                        finished_callback(False, "No files found in downloaded archive")
-                    return
+    def cancel_prefetch(self, keep=None):
+        """Abort prefetch downloads still in flight.
 
-                source_folder = os.path.join(extract_dir, extracted_folders[0])
+        Installs waiting for an aborted prefetch are told so and go on
+        without it.
 
+        :param keep: Branch whose prefetch is left running, if any
+        """
+        self._prefetch_generation += 1
+        self._prefetch_queue = []
+        for branch in [b for b in self._prefetches if b != keep]:
+            state = self._prefetches.pop(branch)
+            if state['reply'] is not None:
+                state['reply'].abort()
+            for callback, _ in state['waiters']:
+                callback(None, "Prefetch cancelled", None)
+
+    def wait_for_prefetch(self, branch, callback, progress_callback=None):
+        """Wait for an in-flight prefetch of a branch to finish.
+
+        :param branch: Branch name
+        :param callback: Function called with (zip_path, error, sha) once the
+            prefetch ended; zip_path is None when nothing was downloaded
+        :param progress_callback: Function called with (bytes received, bytes total)
+        :return: False if no prefetch of the branch is running
+        """
+        state = self._prefetches.get(branch)
+        if state is None:
+            return False
+        state['waiters'].append((callback, progress_callback))
+        return True
+
+    def _start_next_prefetch(self):
+        """Start prefetching the next queued branch, if any."""
+        if not self._prefetch_queue:
+            return
+
+        branch = self._prefetch_queue.pop(0)
+        generation = self._prefetch_generation
+        state = {'reply': None, 'waiters': []}
+        self._prefetches[branch] = state
+
+        def done(zip_path=None, error=None, sha=None):
+            # A cancelled prefetch already notified its waiters
+            if self._prefetches.get(branch) is not state:
+                return
+            del self._prefetches[branch]
+            for callback, _ in state['waiters']:
+                callback(zip_path, error, sha)
+            if generation == self._prefetch_generation:
+                self._start_next_prefetch()
+
+        def on_progress(received, total):
+            for _, progress_callback in state['waiters']:
                 if progress_callback:
-                    progress_callback("Checking existing installation...")
+                    progress_callback(received, total)
 
-                # Get plugins path and target path
-                plugins_path = self.get_plugins_path()
-                target_path = os.path.join(plugins_path, 'pyarchinit')
+        def on_sha_resolved(sha):
+            state['reply'] = None
+            if self._prefetches.get(branch) is not state:
+                return
+
+            existing = self.get_existing_pyarchinit_info()
+            installed_sha = self.get_installed_sha(existing['path']) if existing['exists'] else None
+            if not sha or sha == installed_sha or self.get_cached_zip(branch, sha):
+                done(sha=sha)
+                return
+
+            reply = self.download_to_cache(
+                branch, sha, lambda zip_path, error: done(zip_path, error, sha), on_progress)
+            if self._prefetches.get(branch) is state:
+                state['reply'] = reply
+
+        reply = self.fetch_branch_sha(branch, on_sha_resolved)
+        if self._prefetches.get(branch) is state and state['reply'] is None:
+            state['reply'] = reply
 
-                # Remove any existing pyarchinit installations
-                existing = self.get_existing_pyarchinit_info()
-                if existing['exists']:
-                    if progress_callback:
-                        progress_callback(f"Removing existing installation: {existing['folder_name']}...")
+    def check_up_to_date(self, branch, callback):
+        """Check whether the installed plugin was built from the branch head.
+
+        :param branch: Branch to check ('master', 'dev' or 'stratigraph')
+        :param callback: Function called with True when the installed plugin
+            matches the current remote commit of the branch
+        """
+        actual_branch = self.BRANCHES.get(branch, self.MASTER_BRANCH)
+
+        def on_sha_resolved(sha):
+            existing = self.get_existing_pyarchinit_info()
+            callback(bool(sha) and existing['exists']
+                     and self.get_installed_sha(existing['path']) == sha)
+
+        self.fetch_branch_sha(actual_branch, on_sha_resolved)
+
+    def install_plugin(self, branch, progress_callback=None, finished_callback=None):
+        """Download and install the plugin from the specified branch.
+
+        Archives are cached by branch head SHA, so installing a revision that
+        was already downloaded skips the download entirely.
+
+        :param branch: Branch to install ('master' or 'dev')
+        :param progress_callback: Function to call with progress updates, either
+            a message or (bytes received, bytes total) while downloading
+        :param finished_callback: Function to call when finished (success, message),
+            on success also with the info dict of the installed plugin
+        """
+        # A download or worker of an earlier install may still be running,
+        # e.g. when the dialog was closed and reopened during an install
+        if self._install_running or (
+                self._install_thread is not None and self._install_thread.isRunning()):
+            if finished_callback:
+                finished_callback(False, "An installation is already running")
+            return
+
+        actual_branch = self.BRANCHES.get(branch, self.MASTER_BRANCH)
+        self._install_running = True
+
+        def finish(success, message, *info):
+            self._install_running = False
+            if finished_callback:
+                finished_callback(success, message, *info)
+
+        # Free the bandwidth for the download the user asked for; a
+        # prefetch of the same branch is waited for instead
+        self.cancel_prefetch(keep=actual_branch)
+
+        def install_from_zip(zip_path, sha=None, discard=False, digest=None):
+            if progress_callback:
+                progress_callback("Checking existing installation...")
+
+            plugins_path = self.get_plugins_path()
+            existing = self.get_existing_pyarchinit_info()
+
+            def on_install_finished(success, message):
+                if discard:
                     try:
-                        shutil.rmtree(existing['path'])
-                    except Exception as e:
-                        if finished_callback:
-                            finished_callback(False, f"Failed to remove existing installation: {str(e)}")
-                        return
-
-                # Also check if target exists (in case folder name was different)
-                if os.path.exists(target_path):
-                    if progress_callback:
-                        progress_callback("Removing old pyarchinit folder...")
-                    shutil.rmtree(target_path)
+                        os.remove(zip_path)
+                    except OSError:
+                        # e.g. still locked by a virus scanner; it is a
+                        # .part file, prune_cache removes it eventually
+                        pass
+
+                # The plugins directory just changed, drop the cached scan
+                self._info_cache = None
 
+                if not success:
+                    finish(False, message)
+                    return
+
+                # The worker just wrote the plugin, describe it without
+                # scanning the plugins directory again
+                target_path = os.path.join(plugins_path, 'pyarchinit')
+                try:
+                    version = _read_metadata_fast(os.path.join(target_path, 'metadata.txt'))[1]
+                except OSError:
+                    version = None
+                new_info = {
+                    'exists': True,
+                    'path': target_path,
+                    'version': version or 'Unknown',
+                    'folder_name': 'pyarchinit'
+                }
+                try:
+                    self._info_cache = (os.stat(plugins_path).st_mtime_ns, dict(new_info))
+                except OSError:
+                    pass
+
+                finish(True, f"PyArchInit {branch} (v{new_info['version']}) installed successfully!\n\nPlease restart QGIS to load the plugin.", new_info)
+
+            # Extraction and file copies run in a worker thread so the
+            # dialog stays responsive
+            self._install_thread = QThread()
+            self._install_worker = InstallWorker(
+                zip_path, plugins_path, existing, sha, digest, cached=not discard)
+
+            # Connect before moving the worker so the Python callbacks are
+            # invoked on the GUI thread
+            if progress_callback:
+                self._install_worker.progress.connect(progress_callback)
+            self._install_worker.finished.connect(self._install_thread.quit)
+            self._install_worker.finished.connect(on_install_finished)
+            self._install_thread.started.connect(self._install_worker.run)
+
+            self._install_worker.moveToThread(self._install_thread)
+            self._install_thread.start()
+
+        def on_sha_resolved(sha):
+            cache_path = self.get_cached_zip(actual_branch, sha)
+            if cache_path:
                 if progress_callback:
-                    progress_callback("Copying new plugin files...")
+                    progress_callback(f"Using cached archive for revision {sha[:7]}...")
+                digest = self.get_cached_digest(cache_path)
+                # Refresh mtime so recently used archives are not evicted
+                try:
+                    os.utime(cache_path)
+                    if digest:
+                        os.utime(cache_path + DIGEST_SUFFIX)
+                except OSError:
+                    pass
+                # Cached archives are verified, a fresh download was
+                # checksummed while it was written
+                install_from_zip(cache_path, sha, digest=digest)
+                return
+
+            if progress_callback:
+                progress_callback(f"Downloading {branch} branch...")
 
-                # Copy new plugin to plugins directory
-                shutil.copytree(source_folder, target_path)
+            def on_downloaded(zip_path, error):
+                if error:
+                    finish(False, error)
+                    return
 
-                # Clean up temp directory
                 if progress_callback:
-                    progress_callback("Cleaning up...")
-                shutil.rmtree(temp_dir)
+                    progress_callback("Download complete. Installing...")
+
+                # Without a SHA the archive cannot be reused, drop it afterwards
+                install_from_zip(zip_path, sha, discard=not sha)
+
+            self.download_to_cache(actual_branch, sha, on_downloaded, progress_callback)
 
-                # Get installed version
-                new_info = self.get_existing_pyarchinit_info()
-                version = new_info.get('version', 'Unknown')
+        def on_prefetched(zip_path, error, sha):
+            # A failed prefetch falls back to a regular download
+            if sha:
+                on_sha_resolved(sha)
+                return
+            if progress_callback:
+                progress_callback(f"Checking latest {branch} revision...")
+            self.fetch_branch_sha(actual_branch, on_sha_resolved)
 
-                if finished_callback:
-                    finished_callback(True, f"PyArchInit {branch} (v{version}) installed successfully!\n\nPlease restart QGIS to load the plugin.")
+        if self.wait_for_prefetch(actual_branch, on_prefetched, progress_callback):
+            if progress_callback:
+                progress_callback(f"Waiting for the {branch} download in progress...")
+            return
 
-            except Exception as e:
-                if finished_callback:
-                    finished_callback(False, f"Installation error: {str(e)}")
+        self.prune_cache()
 
-        self.download_branch(actual_branch, on_download_complete)
+        if progress_callback:
+            progress_callback(f"Checking latest {branch} revision...")
+        self.fetch_branch_sha(actual_branch, on_sha_resolved)
 
     def run(self):
         """Run method that performs all the real work."""
@@ -345,3 +1174,6 @@ class PyArchInitInstaller:
         self.dialog.update_current_status(existing)
 
         self.dialog.show()
+
+        # Warm the archive cache while the user picks a branch
+        self.prefetch_branches()